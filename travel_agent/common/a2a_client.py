@@ -1,15 +1,237 @@
 
 """
-This lightweight async utility allows any agent (especially the host) 
+This lightweight async utility allows any agent (especially the host)
 to invoke another agent using the A2A protocol by calling the /run endpoint.
+
+Hedging is opt-in: with hedge=True, if the child hasn't answered by the p90 of
+its recently observed latencies, a duplicate request goes to the next replica
+(or the same url again). The first answer wins and the other one is cancelled.
+HEDGE_BUDGET_PERCENT caps the share of the last HEDGE_BUDGET_WINDOW hedge-eligible
+calls that may send an extra request; warm-up calls don't count.
+
+Every url also gets a circuit breaker. Errors, empty results and calls slower
+than BREAKER_SLOW_CALL_SECONDS count as failures; once the failure rate over the
+recent window crosses BREAKER_FAILURE_RATE the circuit opens and calls fail
+fast with the last good answer cached for that destination. After
+BREAKER_COOLDOWN_SECONDS a single probe is let through (half-open) to decide
+whether to close the circuit again.
 """
 
+import asyncio
+import time
+from collections import OrderedDict, deque
+
 import httpx
-async def call_agent(url, payload):
-    async with httpx.AsyncClient() as client:
-        response = await client.post(url, json=payload, timeout=60.0)
-        response.raise_for_status()
-        return response.json()
-    
+
+HEDGE_BUDGET_PERCENT = 10
+HEDGE_BUDGET_WINDOW = 100
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 5
+BREAKER_FAILURE_RATE = 0.5
+BREAKER_SLOW_CALL_SECONDS = 30.0
+BREAKER_COOLDOWN_SECONDS = 30.0
+FALLBACK_CACHE_SIZE = 256
+# Children reply 200 with empty lists when their LLM call fails
+RESULT_KEYS = ("flights", "stays", "hotels", "activities")
+
+_latencies = {}
+_hedge_window = deque(maxlen=HEDGE_BUDGET_WINDOW)
+_hedge_stats = {"hedged": 0}
+_breakers = {}
+_last_good = OrderedDict()
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a child agent's circuit is open and no cached answer exists
+    """
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self):
+        self.state = self.CLOSED
+        self.outcomes = deque(maxlen=BREAKER_WINDOW)
+        self.opened_at = 0.0
+        self.probing = False
+        self.generation = 0
+
+    def allow(self):
+        """
+        Returns a (generation, is_probe) token for an admitted call, or None
+        when the call should fail fast
+        """
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= BREAKER_COOLDOWN_SECONDS:
+            self._transition(self.HALF_OPEN)
+        if self.state == self.CLOSED:
+            return (self.generation, False)
+        if self.state == self.HALF_OPEN and not self.probing:
+            self.probing = True
+            return (self.generation, True)
+        return None
+
+    def record(self, token, ok):
+        generation, probe = token
+        # Calls admitted before the last state change say nothing about this one
+        if generation != self.generation:
+            return
+        if probe:
+            self._transition(self.CLOSED if ok else self.OPEN)
+            return
+        self.outcomes.append(ok)
+        failures = self.outcomes.count(False)
+        if len(self.outcomes) >= BREAKER_MIN_CALLS and failures / len(self.outcomes) >= BREAKER_FAILURE_RATE:
+            self._transition(self.OPEN)
+
+    def release(self, token):
+        """
+        Lets another caller probe when a cancelled call was the probe
+        """
+        generation, probe = token
+        if probe and generation == self.generation:
+            self.probing = False
+
+    def _transition(self, state):
+        self.state = state
+        self.generation += 1
+        self.probing = False
+        self.outcomes.clear()
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+
+
+def _has_results(result):
+    return isinstance(result, dict) and any(result.get(name) for name in RESULT_KEYS)
+
+
+def _remember(key, result):
+    _last_good[key] = result
+    _last_good.move_to_end(key)
+    if len(_last_good) > FALLBACK_CACHE_SIZE:
+        _last_good.popitem(last=False)
+
+
+def _fallback(url, key, error):
+    if key in _last_good:
+        print(f"Serving cached answer for {url} ({error!r})")
+        return _last_good[key]
+    raise error
+
+
+def _record_latency(url, seconds):
+    _latencies.setdefault(url, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def hedge_delay(url):
+    """
+    Returns the observed p90 latency for url, or None until enough samples exist
+    """
+    samples = _latencies.get(url)
+    if not samples or len(samples) < HEDGE_MIN_SAMPLES:
+        return None
+    ordered = sorted(samples)
+    return ordered[int(0.9 * (len(ordered) - 1))]
+
+
+def _take_hedge_budget():
+    """
+    Spends hedge budget if the recent window allows it. Unused budget doesn't
+    carry over, so a calm period can't fund a burst of extra load later
+    """
+    _hedge_window.append(True)
+    if _hedge_window.count(True) > len(_hedge_window) * HEDGE_BUDGET_PERCENT / 100:
+        _hedge_window[-1] = False
+        return False
+    return True
+
+
+async def _post(client, url, payload):
+    response = await client.post(url, json=payload, timeout=60.0)
+    response.raise_for_status()
+    return response.json()
+
+
+async def _hedged_post(client, url, payload, replicas):
+    tasks = [asyncio.ensure_future(_post(client, url, payload))]
+    try:
+        primary = tasks[0]
+        delay = hedge_delay(url)
+        if delay is None:
+            return await primary
+
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            _hedge_window.append(False)
+            return await primary
+        if not _take_hedge_budget():
+            return await primary
+
+        _hedge_stats["hedged"] += 1
+        backup_url = replicas[(_hedge_stats["hedged"] - 1) % len(replicas)]
+        print(f"Hedging request to {url} via {backup_url} after {delay:.2f}s")
+        tasks.append(asyncio.ensure_future(_post(client, backup_url, payload)))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            # A failed attempt only loses if the other one can still answer
+            if not pending:
+                return done.pop().result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def _send(url, payload, hedge, replicas):
+    start = time.monotonic()
+    try:
+        async with httpx.AsyncClient() as client:
+            if not hedge:
+                return await _post(client, url, payload)
+            return await _hedged_post(client, url, payload, replicas or [url])
+    finally:
+        # Timed out, failed and cancelled calls are kept as lower-bound samples
+        # measured from the primary's start, so the slow tail stays in the window
+        _record_latency(url, time.monotonic() - start)
+
+
+async def call_agent(url, payload, hedge=False, replicas=None):
+    breaker = _breakers.setdefault(url, CircuitBreaker())
+    key = (url, payload.get("destination"))
+    token = breaker.allow()
+    if token is None:
+        return _fallback(url, key, CircuitOpenError(f"Circuit open for {url}"))
+
+    start = time.monotonic()
+    try:
+        result = await _send(url, payload, hedge, replicas)
+    except asyncio.CancelledError:
+        breaker.release(token)
+        raise
+    except (httpx.HTTPError, ValueError) as e:
+        breaker.record(token, False)
+        return _fallback(url, key, e)
+    except Exception:
+        breaker.record(token, False)
+        raise
+
+    ok = _has_results(result)
+    breaker.record(token, ok and time.monotonic() - start <= BREAKER_SLOW_CALL_SECONDS)
+    if not ok:
+        if key in _last_good:
+            print(f"Serving cached answer for {url} (empty result)")
+            return _last_good[key]
+        return result
+    _remember(key, result)
+    return result
 
 
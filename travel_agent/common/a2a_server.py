@@ -1,8 +1,23 @@
-from fastapi import FastAPI
+import time
+
+from fastapi import FastAPI, Response
 import uvicorn
-def create_app(agent):
+
+from travel_agent.common import recorder
+
+
+def create_app(agent, name=None):
     app = FastAPI()
+    recorder.set_app_name(name)
     @app.post("/run")
-    async def run(payload: dict):
-        return await agent.execute(payload)
+    async def run(payload: dict, response: Response):
+        # Wall-clock arrival time orders and schedules requests during replay
+        arrived = time.time()
+        start = time.monotonic()
+        result = await agent.execute(payload)
+        duration = time.monotonic() - start
+        # Lets replay.py compare against recordings on the same server-side basis
+        response.headers["X-Process-Time"] = f"{duration:.6f}"
+        recorder.record_run(name, payload, result, duration, arrived)
+        return result
     return app
\ No newline at end of file
@@ -0,0 +1,136 @@
+
+"""
+Request/response recorder used for load testing and regression benchmarking.
+
+Set TRAVEL_RECORD_DIR to capture traffic: every /run call (payload, response,
+duration) and every final LLM response (prompt, raw text, duration) is appended
+when it completes, stamped with its start time as "ts", as one JSON line to a gzip log in that directory, one file per process.
+
+Set TRAVEL_REPLAY_DIR to serve the LLM layer from a recording instead of the
+model. Final responses are looked up by app name and prompt. When
+TRAVEL_REPLAY_SPEED is set, each replayed LLM response waits for its recorded
+duration divided by that factor; otherwise it is returned immediately.
+See replay.py for driving recorded /run traffic against a build.
+"""
+
+import asyncio
+import atexit
+import glob
+import gzip
+import json
+import os
+import time
+from collections import defaultdict, deque
+
+_log = None
+_replay_index = None
+_app_name = None
+
+
+def set_app_name(name):
+    """
+    Names this process's entries; create_app() calls it so /run and LLM
+    entries share the same app name
+    """
+    global _app_name
+    _app_name = name
+
+
+# Read lazily so settings loaded by load_dotenv() after import still apply
+def _record_dir():
+    return os.getenv("TRAVEL_RECORD_DIR")
+
+
+def _replay_dir():
+    return os.getenv("TRAVEL_REPLAY_DIR")
+
+
+def _write(entry):
+    global _log
+    if _log is None:
+        os.makedirs(_record_dir(), exist_ok=True)
+        path = os.path.join(_record_dir(), f"traffic-{os.getpid()}.jsonl.gz")
+        _log = gzip.open(path, "at", encoding="utf-8")
+        atexit.register(_log.close)
+    _log.write(json.dumps(entry, default=str) + "\n")
+    _log.flush()
+
+
+def record_run(app, payload, response, duration, started):
+    if _record_dir():
+        _write({"kind": "run", "app": app, "payload": payload, "response": response,
+                "duration": duration, "ts": started})
+
+
+def record_llm(app, prompt, text, duration, started):
+    if _record_dir():
+        _write({"kind": "llm", "app": app, "prompt": prompt, "text": text,
+                "duration": duration, "ts": started})
+
+
+def load(directory):
+    """
+    Reads every record in a recording directory, ordered by start time
+    """
+    entries = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl*"))):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.strip():
+                        entries.append(json.loads(line))
+            except (EOFError, json.JSONDecodeError) as e:
+                # Logs of running or killed processes have no end-of-stream marker
+                print(f"Stopped reading {path} at its unfinished tail: {e!r}")
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
+
+
+def _replayed_llm(app, prompt):
+    global _replay_index
+    if _replay_index is None:
+        _replay_index = defaultdict(deque)
+        for entry in load(_replay_dir()):
+            if entry["kind"] == "llm":
+                _replay_index[(entry["app"], entry["prompt"])].append(entry)
+    responses = _replay_index.get((app, prompt))
+    if not responses:
+        raise KeyError(f"No recorded LLM response for {app}: {prompt[:80]!r}")
+    # Rotate so repeated prompts cycle through every recorded answer
+    entry = responses[0]
+    responses.rotate(-1)
+    return entry
+
+
+class _ReplayEvent:
+    def __init__(self, content):
+        self.content = content
+
+    def is_final_response(self):
+        return True
+
+
+async def run_async(runner, user_id, session_id, new_message):
+    """
+    Drop-in for runner.run_async() that records or replays the final response
+    """
+    app = _app_name or runner.app_name
+    prompt = "".join(part.text or "" for part in new_message.parts)
+
+    if _replay_dir():
+        from google.genai import types
+
+        entry = _replayed_llm(app, prompt)
+        speed = float(os.getenv("TRAVEL_REPLAY_SPEED") or 0)
+        if speed > 0:
+            await asyncio.sleep(entry["duration"] / speed)
+        yield _ReplayEvent(types.Content(role="model", parts=[types.Part(text=entry["text"])]))
+        return
+
+    started = time.time()
+    start = time.monotonic()
+    async for event in runner.run_async(user_id=user_id, session_id=session_id, new_message=new_message):
+        if event.is_final_response():
+            record_llm(app, prompt, event.content.parts[0].text, time.monotonic() - start, started)
+        yield event
@@ -0,0 +1,99 @@
+
+"""
+Replays recorded /run traffic against a running build.
+
+Requests keep their recorded spacing, compressed by --speed, and each response
+is compared with the recorded one. Latency is compared on the server side,
+where the recording measured it; client round trip is reported separately.
+Start the agents with TRAVEL_REPLAY_DIR pointing at the same recording so
+their LLM layer is served from it, e.g.
+
+    python -m travel_agent.common.replay recordings/ --app host_agent \\
+        --url http://localhost:8000/run --speed 4
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from travel_agent.common.recorder import load
+
+
+def _positive_float(value):
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {value}")
+    return speed
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+async def _send(client, url, entry, delay, results):
+    await asyncio.sleep(delay)
+    start = time.monotonic()
+    server = None
+    try:
+        response = await client.post(url, json=entry["payload"], timeout=60.0)
+        response.raise_for_status()
+        body = response.json()
+        if "X-Process-Time" in response.headers:
+            server = float(response.headers["X-Process-Time"])
+    except (httpx.HTTPError, ValueError) as e:
+        print(f"Replay request failed: {e!r}")
+        body = None
+    results.append({
+        "round_trip": time.monotonic() - start,
+        "server": server,
+        "recorded": entry["duration"],
+        "match": body == entry["response"],
+    })
+
+
+async def replay(directory, app, url, speed):
+    entries = [entry for entry in load(directory) if entry["kind"] == "run" and entry["app"] == app]
+    if not entries:
+        print(f"No recorded /run traffic for {app} in {directory}")
+        return []
+    first = entries[0]["ts"]
+    results = []
+    async with httpx.AsyncClient() as client:
+        await asyncio.gather(*(
+            _send(client, url, entry, (entry["ts"] - first) / speed, results)
+            for entry in entries
+        ))
+    return results
+
+
+def report(results):
+    """
+    Server-side time (X-Process-Time, measured like the recording) is compared
+    with the recorded duration; round trip adds client and network overhead
+    """
+    matches = sum(1 for result in results if result["match"])
+    print(f"Replayed {len(results)} requests, {matches} responses matched the recording")
+    timed = [result for result in results if result["server"] is not None]
+    round_trip = [result["round_trip"] for result in results]
+    for label, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        line = f"{label}: round trip {_percentile(round_trip, fraction):.3f}s"
+        if timed:
+            server = _percentile([result["server"] for result in timed], fraction)
+            recorded = _percentile([result["recorded"] for result in timed], fraction)
+            line += f", server {server:.3f}s vs recorded server {recorded:.3f}s"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded /run traffic against a running agent.")
+    parser.add_argument("directory", help="Directory written via TRAVEL_RECORD_DIR")
+    parser.add_argument("--app", default="host_agent", help="Recorded app name to replay")
+    parser.add_argument("--url", default="http://localhost:8000/run")
+    parser.add_argument("--speed", type=_positive_float, default=1.0, help="Replay at N times the recorded rate")
+    args = parser.parse_args()
+    results = asyncio.run(replay(args.directory, args.app, args.url, args.speed))
+    if results:
+        report(results)
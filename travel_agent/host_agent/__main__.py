@@ -1,6 +1,6 @@
 from  travel_agent.common.a2a_server import create_app
 from .task_manager import run
-app = create_app(agent=type("Agent", (), {"execute": run}))
+app = create_app(agent=type("Agent", (), {"execute": run}), name="host_agent")
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, port=8000)
\ No newline at end of file
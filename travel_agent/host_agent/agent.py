@@ -7,6 +7,8 @@ from google.adk.sessions import InMemorySessionService
 from google.genai import types
 from dotenv import load_dotenv
 
+from travel_agent.common import recorder
+
 load_dotenv()
 # load_dotenv(dotenv_path="/Users/siweitang/Documents/experienment/DataCamp_GoogleADK/.env")
 
@@ -52,7 +54,7 @@ async def execute(request):
         f"within a total budget of {request['budget']}. Call the flights, stays, and activities agents for results."
     )
     message = types.Content(role="user", parts=[types.Part(text=prompt)])
-    async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=message):
+    async for event in recorder.run_async(runner, user_id=USER_ID, session_id=SESSION_ID, new_message=message):
         if event.is_final_response():
             return {"summary": event.content.parts[0].text}
         
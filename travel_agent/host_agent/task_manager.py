@@ -1,4 +1,5 @@
 import json
+import os
 import re
 """
 The task manager executes the orchestration logic by calling remote agents 
@@ -7,12 +8,25 @@ For its practical implementation, we define the service URLs for each child agen
 These endpoints conform to the A2A /run protocol 
 and expect a shared TravelRequest` JSON schema.
 """
-from travel_agent.common.a2a_client import call_agent
+import httpx
+from dotenv import load_dotenv
+
+from travel_agent.common.a2a_client import CircuitOpenError, call_agent
 
 FLIGHT_URL = "http://localhost:8001/run"
 STAY_URL = "http://localhost:8002/run"
 ACTIVITIES_URL = "http://localhost:8003/run"
 
+load_dotenv()
+
+
+def hedge_child_calls():
+    """
+    Opt-in request hedging for child calls (see common/a2a_client.py).
+    Read at call time so .env and runtime changes both apply
+    """
+    return os.getenv("A2A_HEDGE", "").lower() in ("1", "true", "yes")
+
 def extract_json_from_response(response):
     """
     Helper function to extract JSON from various response formats
@@ -44,14 +58,25 @@ def extract_json_from_response(response):
     
     return {}
 
+async def call_child(url, payload):
+    """
+    Calls a child agent, returning an empty result instead of aborting the
+    whole plan when it is down and has no cached answer
+    """
+    try:
+        return await call_agent(url, payload, hedge=hedge_child_calls())
+    except (CircuitOpenError, httpx.HTTPError, ValueError) as e:
+        print(f"Child agent {url} unavailable: {e!r}")
+        return {}
+
 # define the payload.
 async def run(payload):
     # Print what the host agent is sending
     print("Incoming payload:", payload)
     
-    flights_response = await call_agent(FLIGHT_URL, payload)
-    stay_response = await call_agent(STAY_URL, payload)
-    activities_response = await call_agent(ACTIVITIES_URL, payload)
+    flights_response = await call_child(FLIGHT_URL, payload)
+    stay_response = await call_child(STAY_URL, payload)
+    activities_response = await call_child(ACTIVITIES_URL, payload)
     
     # Log raw responses
     print("Raw flights response:", flights_response)
@@ -6,6 +6,8 @@ from google.genai import types
 import json
 from dotenv import load_dotenv
 
+from travel_agent.common import recorder
+
 load_dotenv()
 
 stay_agent = Agent(
@@ -42,7 +44,7 @@ async def execute(request):
     )
     message = types.Content(role="user", parts=[types.Part(text=prompt)])
     try:
-        async for event in runner.run_async(user_id=USER_ID, session_id=SESSION_ID, new_message=message):
+        async for event in recorder.run_async(runner, user_id=USER_ID, session_id=SESSION_ID, new_message=message):
             if event.is_final_response():
                 response_text = event.content.parts[0].text
                 print(f"Stay agent raw response: {response_text}")  # Debug print